@@ -7,11 +7,581 @@ against prompt injection attacks.
 Based on OWASP guidelines and current research (2026).
 """
 
+import hashlib
 import re
-from typing import Tuple, List, Optional
+import sys
+import threading
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Tuple, List, Optional, Set
 from dataclasses import dataclass
 from collections import OrderedDict
 
+try:  # Python 3.11+
+    from re import _parser as _sre_parse
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse as _sre_parse
+
+
+# Literal anchors: every match of a pattern contains at least one of its
+# anchor strings, so a plain substring test on lowercased text can rule the
+# pattern out before the regex engine runs. Anchors are derived from the
+# parsed pattern, which keeps them in sync with the pattern lists (including
+# subclass overrides). A pattern without usable anchors is always searched.
+_MAX_LITERALS = 16
+_MAX_CLASS_SIZE = 10
+_EMPTY_RUN = frozenset([""])
+
+_CLASS_CATEGORIES = {
+    _sre_parse.CATEGORY_DIGIT: lambda c: c.isdigit(),
+    _sre_parse.CATEGORY_NOT_DIGIT: lambda c: not c.isdigit(),
+    _sre_parse.CATEGORY_SPACE: lambda c: c.isspace(),
+    _sre_parse.CATEGORY_NOT_SPACE: lambda c: not c.isspace(),
+    _sre_parse.CATEGORY_WORD: lambda c: c.isalnum() or c == "_",
+    _sre_parse.CATEGORY_NOT_WORD: lambda c: not (c.isalnum() or c == "_"),
+}
+
+_REPEATS = tuple(
+    op for op in (
+        _sre_parse.MAX_REPEAT,
+        _sre_parse.MIN_REPEAT,
+        getattr(_sre_parse, "POSSESSIVE_REPEAT", None),
+    ) if op is not None
+)
+
+
+def _cross(left, right):
+    """Concatenate two literal sets, or None if the result gets too large."""
+    if len(left) * len(right) > _MAX_LITERALS:
+        return None
+    return frozenset(a + b for a in left for b in right)
+
+
+def _selectivity(literals):
+    if literals is None or "" in literals:
+        return None
+    if not literals:
+        # Empty set: the pattern cannot match ASCII text at all.
+        return (float("inf"), 0)
+    return (min(len(lit) for lit in literals), -len(literals))
+
+
+def _better(left, right):
+    """Pick the more selective of two anchor sets (None means no anchor)."""
+    left_score, right_score = _selectivity(left), _selectivity(right)
+    if right_score is not None and (left_score is None or right_score > left_score):
+        return right
+    return left if left_score is not None else None
+
+
+def _class_literals(items):
+    """Lowercased ASCII characters a case-insensitive character class accepts."""
+    negate = False
+    members = set()
+    wide = False
+    for op, av in items:
+        if op is _sre_parse.NEGATE:
+            negate = True
+        elif op is _sre_parse.LITERAL:
+            members.add(av)
+            wide = wide or av > 127
+        elif op is _sre_parse.RANGE:
+            members.update(range(av[0], min(av[1], 127) + 1))
+            wide = wide or av[1] > 127
+        elif op is _sre_parse.CATEGORY and av in _CLASS_CATEGORIES:
+            test = _CLASS_CATEGORIES[av]
+            members.update(c for c in range(128) if test(chr(c)))
+        else:
+            return None
+    if wide and not negate:
+        # Non-ASCII members may case-fold onto ASCII letters.
+        return None
+    accepted = frozenset(
+        chr(c).lower() for c in range(128)
+        if (c in members
+            or ord(chr(c).lower()) in members
+            or ord(chr(c).upper()) in members) != negate
+    )
+    return accepted if len(accepted) <= _MAX_CLASS_SIZE else None
+
+
+def _node_literals(op, av):
+    """Return (exact, anchors) for a single parsed regex node."""
+    if op is _sre_parse.LITERAL:
+        char = chr(av)
+        if not char.isascii():
+            return None, None
+        lit = frozenset([char.lower()])
+        return lit, lit
+    if op is _sre_parse.IN:
+        lit = _class_literals(av)
+        return lit, lit
+    if op is _sre_parse.SUBPATTERN:
+        _, _, del_flags, items = av
+        if del_flags & re.IGNORECASE:
+            # (?-i:...) is case-sensitive; its literals are not case-folded.
+            return None, None
+        return _sequence_literals(items)
+    if op is getattr(_sre_parse, "ATOMIC_GROUP", None):
+        return _sequence_literals(av)
+    if op is _sre_parse.BRANCH:
+        branches = [_sequence_literals(branch) for branch in av[1]]
+        if all(exact is not None for exact, _ in branches):
+            union = frozenset().union(*(exact for exact, _ in branches))
+            if len(union) <= _MAX_LITERALS:
+                return union, union
+        anchors = [exact if exact is not None else found for exact, found in branches]
+        if any(_selectivity(found) is None for found in anchors):
+            return None, None
+        return None, frozenset().union(*anchors)
+    if op in _REPEATS:
+        low, high, item = av
+        exact, anchors = _sequence_literals(item)
+        if high == 0:
+            return _EMPTY_RUN, None
+        if low == 0:
+            if exact is not None and high == 1:
+                return exact | _EMPTY_RUN, None
+            return None, None
+        if exact is not None and low == high:
+            repeated = _EMPTY_RUN
+            for _ in range(low):
+                repeated = _cross(repeated, exact)
+                if repeated is None:
+                    break
+            if repeated is not None:
+                return repeated, repeated
+        return None, exact if exact is not None else anchors
+    return None, None
+
+
+def _sequence_literals(items):
+    """
+    Return (exact, anchors) for a parsed regex sequence.
+
+    ``exact`` is the full set of lowercased strings the sequence can match
+    (or None when that set is unbounded); ``anchors`` is a set of literals
+    of which every match contains at least one (or None).
+    """
+    run = _EMPTY_RUN
+    whole = True
+    best = None
+    for op, av in items:
+        exact, anchors = _node_literals(op, av)
+        if exact is not None:
+            joined = _cross(run, exact)
+            if joined is None:
+                best = _better(best, run)
+                run = exact
+                whole = False
+            else:
+                run = joined
+        else:
+            best = _better(_better(best, run), anchors)
+            run = _EMPTY_RUN
+            whole = False
+    if whole:
+        return run, run
+    return None, _better(best, run)
+
+
+_ESCAPE_OR_UPPER = re.compile(r"\\.|[A-Z]", re.DOTALL)
+
+# Escapes that spell out a code point (\x41 is uppercase A whatever the
+# case of the surrounding source), so lowercasing the source misses them.
+_CODE_POINT_ESCAPES = frozenset("xuUN01234567")
+
+
+def _fold_case(match) -> str:
+    token = match.group()
+    return token if len(token) > 1 else token.lower()
+
+
+def _ranges(items):
+    """Yield every (low, high) character range in a parsed pattern."""
+    for item in items:
+        if isinstance(item, tuple) and len(item) == 2 and item[0] is _sre_parse.RANGE:
+            yield item[1]
+        elif isinstance(item, (tuple, list, _sre_parse.SubPattern)):
+            yield from _ranges(item)
+
+
+def _folds_safely(pattern: str) -> bool:
+    """
+    Whether lowercasing the pattern source keeps its meaning on lowercased
+    text. Inline flags, code point escapes and ranges that cover only part
+    of A-Z (``[A-z]``, ``[0-Z]``) change meaning when folded.
+    """
+    if "(?" in pattern or not pattern.isascii():
+        return False
+    for match in _ESCAPE_OR_UPPER.finditer(pattern):
+        token = match.group()
+        if len(token) > 1 and token[1] in _CODE_POINT_ESCAPES:
+            return False
+    for low, high in _ranges(_sre_parse.parse(pattern)):
+        if low <= ord("Z") and high >= ord("A") and not (
+            low >= ord("A") and high <= ord("Z")
+        ):
+            return False
+    return True
+
+
+def _compile_folded(pattern: str):
+    """
+    Compile a pattern for searching already-lowercased ASCII text.
+
+    Lowercasing the pattern source (escapes such as \\S are left alone) lets
+    the regex engine run without IGNORECASE, which skips per-character case
+    folding. Patterns that cannot be rewritten safely (see _folds_safely())
+    are returned with the flag instead, to be searched on the original text.
+    """
+    try:
+        if _folds_safely(pattern):
+            return re.compile(_ESCAPE_OR_UPPER.sub(_fold_case, pattern))
+    except re.error:
+        pass
+    return re.compile(pattern, re.IGNORECASE)
+
+
+@lru_cache(maxsize=None)
+def _pattern_literals(pattern: str):
+    """Return (exact, anchors) for a case-insensitive pattern, see below."""
+    exact, anchors = _sequence_literals(_sre_parse.parse(pattern, re.IGNORECASE))
+    if _selectivity(anchors) is None:
+        return None, None
+    # A literal containing a shorter anchor is redundant.
+    anchors = frozenset(
+        lit for lit in anchors
+        if not any(other != lit and other in lit for other in anchors)
+    )
+    return (anchors if exact is not None else None), anchors
+
+
+def _literal_anchors(pattern: str) -> Optional[frozenset]:
+    """Anchor literals for a case-insensitive pattern, or None if unknown."""
+    return _pattern_literals(pattern)[1]
+
+
+def _is_literal(pattern: str) -> bool:
+    """
+    Whether a pattern matches exactly a fixed set of literals.
+
+    For such patterns (e.g. ``\\[SYSTEM\\]``) finding an anchor in the
+    lowercased ASCII text *is* a match, so the regex need not run at all.
+    """
+    return _pattern_literals(pattern)[0] is not None
+
+
+# search_found() runs at most this many gated patterns one by one before
+# falling back to the group's union (see there).
+_MAX_GATED_SEARCHES = 2
+
+
+class _PatternGroup:
+    """
+    Compiled forms of one pattern list.
+
+    Groups are built once per distinct pattern list by _pattern_group() and
+    shared by every detector and validator instance.
+    """
+
+    def __init__(self, sources: Tuple[str, ...]):
+        # Per-pattern regexes, used for sanitization and non-ASCII text.
+        self.patterns = tuple(re.compile(p, re.IGNORECASE) for p in sources)
+        # Union of the whole group, for single-search checks.
+        self.union = re.compile(
+            "|".join(f"(?:{p})" for p in sources), re.IGNORECASE
+        )
+        # Case-folded patterns and their literal anchors for lowercased
+        # ASCII text, see _compile_folded() and _literal_anchors().
+        self.folded = tuple(_compile_folded(p) for p in sources)
+        self.anchors = tuple(_literal_anchors(p) for p in sources)
+        # (pattern, anchors, folded) per pattern. Pure-literal patterns are
+        # settled by their anchors alone; patterns that kept IGNORECASE are
+        # searched on the original text rather than the lowercased one.
+        self._gated = tuple(
+            (
+                None if _is_literal(source) else pattern,
+                anchors,
+                not pattern.flags & re.IGNORECASE,
+            )
+            for source, pattern, anchors in zip(sources, self.folded, self.anchors)
+        )
+        # Deduplicated anchors of the whole group: one pass over these
+        # rejects clean text without visiting each pattern. None when some
+        # pattern has no anchors and must always be searched.
+        if all(anchors is not None for anchors in self.anchors):
+            literals = frozenset().union(*self.anchors)
+            self.group_anchors = frozenset(
+                lit for lit in literals
+                if not any(other != lit and other in lit for other in literals)
+            )
+        else:
+            self.group_anchors = None
+
+    def search(self, text: str, lowered: Optional[str]) -> bool:
+        """
+        Check whether any pattern in the group matches.
+
+        ``lowered`` is ``text.lower()`` for ASCII text and None otherwise.
+        Non-ASCII text goes straight to the union regex: IGNORECASE folds a
+        few non-ASCII letters onto ASCII ones, which lowercased anchors miss.
+        """
+        if lowered is None:
+            return self.union.search(text) is not None
+        return self.search_found(text, lowered, _anchor_scan((self,))(lowered))
+
+    def search_found(self, text: str, lowered: str, found: Set[str]) -> bool:
+        """
+        Check ASCII text for a match, given the anchors in it.
+
+        ``lowered`` is ``text.lower()`` and ``found`` is the set of this
+        group's anchors present in it, as returned by an _AnchorScan
+        covering the group.
+        """
+        group_anchors = self.group_anchors
+        if group_anchors is not None and group_anchors.isdisjoint(found):
+            return False
+        candidates = []
+        for pattern, anchors, folded in self._gated:
+            if anchors is not None and anchors.isdisjoint(found):
+                continue
+            if pattern is None:
+                return True
+            candidates.append((pattern, folded))
+        # Each gated search is a full pass over the text; once many of the
+        # group's patterns pass the gate, one union pass is cheaper.
+        if (len(candidates) > _MAX_GATED_SEARCHES
+                and len(candidates) * 3 > len(self._gated)):
+            return self.union.search(text) is not None
+        for pattern, folded in candidates:
+            if pattern.search(lowered if folded else text):
+                return True
+        return False
+
+
+class _AnchorScan:
+    """
+    One pass over lowercased ASCII text for the anchors of several groups.
+
+    Each distinct literal is looked up once for all groups, instead of once
+    per group and again per pattern. A literal containing shorter ones is
+    only looked up when all of those were found.
+    """
+
+    def __init__(self, groups: Tuple[_PatternGroup, ...]):
+        literals = set()
+        for group in groups:
+            for anchors in group.anchors:
+                if anchors:
+                    literals.update(anchors)
+        roots = frozenset(
+            lit for lit in literals
+            if not any(other != lit and other in lit for other in literals)
+        )
+        self._roots = tuple(sorted(roots))
+        self._rest = tuple(
+            (lit, frozenset(root for root in roots if root in lit))
+            for lit in sorted(literals - roots)
+        )
+
+    def __call__(self, lowered: str) -> Set[str]:
+        """Return the set of anchors occurring in ``lowered``."""
+        found = {lit for lit in self._roots if lit in lowered}
+        if found:
+            for lit, roots in self._rest:
+                if roots <= found and lit in lowered:
+                    found.add(lit)
+        return found
+
+    def scan_many(self, buffer: str, starts: List[int],
+                  lowered: List[str]) -> List[Set[str]]:
+        """
+        Return the set of anchors occurring in each of several texts.
+
+        ``buffer`` is ``lowered`` joined with _BATCH_SEPARATOR and ``starts``
+        holds each text's offset in it. Each root literal is located with
+        one pass over the buffer instead of one lookup per text.
+        """
+        found = [set() for _ in lowered]
+        for lit in self._roots:
+            for i in _texts_containing(buffer, starts, lowered, lit):
+                found[i].add(lit)
+        for hits, text in zip(found, lowered):
+            if hits:
+                for lit, roots in self._rest:
+                    if roots <= hits and lit in text:
+                        hits.add(lit)
+        return found
+
+
+@lru_cache(maxsize=None)
+def _anchor_scan(groups: Tuple[_PatternGroup, ...]) -> _AnchorScan:
+    return _AnchorScan(groups)
+
+
+def _texts_containing(buffer: str, starts: List[int], texts: List[str],
+                      literal: str) -> List[int]:
+    """Indexes of the joined texts in which the literal occurs."""
+    hits = []
+    last = len(starts) - 1
+    pos = buffer.find(literal)
+    while pos != -1:
+        i = bisect_right(starts, pos) - 1
+        # Occurrences running into (or starting on) the separator don't count.
+        if pos + len(literal) <= starts[i] + len(texts[i]):
+            hits.append(i)
+        if i == last:
+            break
+        # One occurrence per text is enough; skip to the next text.
+        pos = buffer.find(literal, starts[i + 1])
+    return hits
+
+
+# Joins texts for PromptInjectionDetector.analyze_many(). Only anchor
+# occurrences lying wholly inside one text are counted, so any separator
+# is correct, even one that patterns themselves can match.
+_BATCH_SEPARATOR = "\x00"
+
+# Texts at least this long are scanned on their own by analyze_many(): past a
+# few hundred characters, the per-lookup overhead that batching saves is
+# outweighed by searching the larger joined buffer.
+_BATCH_TEXT_CHARS = 256
+
+
+@lru_cache(maxsize=None)
+def _pattern_group(sources: Tuple[str, ...]) -> _PatternGroup:
+    return _PatternGroup(sources)
+
+
+def _lowered(text: str) -> Optional[str]:
+    return text.lower() if text.isascii() else None
+
+
+# Analysis cache limits. Short texts are their own cache key; longer ones
+# are keyed by a digest so cached entries never pin large inputs in memory.
+_CACHE_KEY_MAX_CHARS = 256
+_CACHE_MAX_TEXT_CHARS = 64 * 1024
+_CACHE_BYTE_BUDGET = 1024 * 1024
+_CACHE_ENTRY_OVERHEAD = 128  # value tuple plus dict/ordering bookkeeping
+
+
+_SKETCH_MIN_WIDTH = 1 << 10
+_SKETCH_MAX_WIDTH = 1 << 16  # one 16-bit slice of the key's hash per row
+_SKETCH_MAX_COUNT = 15
+# bytes.translate() table that halves every counter when the sketch ages.
+_HALVE = bytes(i // 2 for i in range(256))
+
+
+class _AnalysisCache:
+    """
+    LRU cache with TinyLFU admission, bounded by an approximate byte budget.
+
+    A count-min sketch estimates how often each key was requested recently,
+    with a one-bit "doorkeeper" absorbing first sightings. Once the budget
+    is reached, a new entry only displaces the least recently used one if
+    it has been requested more often, so a burst of one-off inputs cannot
+    flush results that keep recurring.
+    """
+
+    def __init__(self, budget: int = _CACHE_BYTE_BUDGET):
+        self.budget = budget
+        self.bytes_used = 0
+        self._entries = OrderedDict()
+        # Detectors are shared across threads by the convenience functions.
+        self._lock = threading.Lock()
+        width = _SKETCH_MIN_WIDTH
+        while width < budget // 256 and width < _SKETCH_MAX_WIDTH:
+            width *= 2
+        self._mask = width - 1
+        self._sketch = [bytearray(width) for _ in range(4)]
+        self._doorkeeper = bytearray(width)
+        self._sample_size = 10 * width
+        self._additions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes_used = 0
+
+    def _slots(self, key):
+        h = hash(key)
+        mask = self._mask
+        return (h & mask, (h >> 16) & mask, (h >> 32) & mask, (h >> 48) & mask)
+
+    def _record(self, key):
+        slots = self._slots(key)
+        if not self._doorkeeper[slots[0]]:
+            self._doorkeeper[slots[0]] = 1
+        else:
+            for row, slot in zip(self._sketch, slots):
+                if row[slot] < _SKETCH_MAX_COUNT:
+                    row[slot] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            # Age the sketch so stale popularity fades out.
+            self._sketch = [row.translate(_HALVE) for row in self._sketch]
+            self._doorkeeper = bytearray(len(self._doorkeeper))
+            self._additions //= 2
+
+    def _frequency(self, key) -> int:
+        slots = self._slots(key)
+        count = min(row[slot] for row, slot in zip(self._sketch, slots))
+        return count + self._doorkeeper[slots[0]]
+
+    def get(self, key):
+        """Return the cached value for key (or None), counting the request."""
+        with self._lock:
+            self._record(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size: int):
+        """Store value under key unless the admission filter rejects it."""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes_used -= previous[1]
+            elif self._entries and self.bytes_used + size > self.budget:
+                victim = next(iter(self._entries))
+                if self._frequency(key) <= self._frequency(victim):
+                    return
+            self._entries[key] = (value, size)
+            self.bytes_used += size
+            while self._entries and self.bytes_used > self.budget:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes_used -= evicted_size
+
+
+def _sizeof(obj) -> int:
+    """sys.getsizeof(), estimated from len() where it is unsupported (PyPy)."""
+    try:
+        return sys.getsizeof(obj)
+    except TypeError:
+        return 64 + 4 * len(obj)
+
+
+def _cache_key(text: str):
+    if len(text) <= _CACHE_KEY_MAX_CHARS:
+        return text
+    # surrogatepass keeps the encoding injective, so distinct texts never
+    # share a key (dropping unencodable characters would let them collide).
+    return hashlib.blake2b(
+        text.encode("utf-8", "surrogatepass"), digest_size=16
+    ).digest()
+
 
 @dataclass
 class SecurityResult:
@@ -37,12 +607,12 @@ class PromptInjectionDetector:
         r'\bforget\s+(everything|all|your)\s+(you\s+)?(know|learned|were\s+told)\b',
         r'\bnew\s+instructions?\b',
         r'\boverride\s+(your|the)\s+(system|instructions?|rules?)\b',
-        r'\b bypass\s+(safety|security|guidelines?|rules?)\b',
+        r'\bbypass\s+(safety|security|guidelines?|rules?)\b',
         r'\bdisable\s+(safety|security|filters?|restrictions?)\b',
         
         # Role playing jailbreaks
         r'\b(you\s+are\s+now|act\s+as|pretend)\b',
-        r'\b(dan|developer| jailbreak|unrestricted)\b',
+        r'\b(dan|developer|jailbreak|unrestricted)\b',
         r'\bwithout\s+(restrictions?|guidelines?|limits?)\b',
         r'\bno\s+(restrictions?|guidelines?|limits?)\b',
         r'\bsystem\s*prompt\s*:',
@@ -91,38 +661,37 @@ class PromptInjectionDetector:
         Args:
             strict_mode: If True, be more aggressive in detecting potential threats
         """
-        self.strict_mode = strict_mode
         # Cache repeated analyses (common in batched tool pipelines/tests).
-        # Key: input text; Value: (is_safe, threats tuple, confidence)
-        self._analysis_cache = OrderedDict()
-        self._analysis_cache_size = 256
+        # Key: _cache_key(text); Value: (is_safe, threats tuple, confidence)
+        self._analysis_cache = _AnalysisCache()
         self._compile_patterns()
+        self.strict_mode = strict_mode
     
     def _compile_patterns(self):
-        """Pre-compile all regex patterns for performance."""
-        self._instruction_patterns = [
-            re.compile(p, re.IGNORECASE) for p in self.INSTRUCTION_OVERRIDE_PATTERNS
-        ]
-        self._context_patterns = [
-            re.compile(p, re.IGNORECASE) for p in self.CONTEXT_MANIPULATION_PATTERNS
-        ]
-        self._encoding_patterns = [
-            re.compile(p, re.IGNORECASE) for p in self.ENCODING_PATTERNS
-        ]
-        # Fast-path compiled unions for analyze(). Keeps behavior equivalent
-        # while reducing per-call regex iterations in hot paths.
-        self._instruction_any_pattern = re.compile(
-            "|".join(f"(?:{p})" for p in self.INSTRUCTION_OVERRIDE_PATTERNS),
-            re.IGNORECASE,
-        )
-        self._context_any_pattern = re.compile(
-            "|".join(f"(?:{p})" for p in self.CONTEXT_MANIPULATION_PATTERNS),
-            re.IGNORECASE,
-        )
-        self._encoding_any_pattern = re.compile(
-            "|".join(f"(?:{p})" for p in self.ENCODING_PATTERNS),
-            re.IGNORECASE,
-        )
+        """Look up the shared compiled pattern groups for this class."""
+        self._instruction = _pattern_group(tuple(self.INSTRUCTION_OVERRIDE_PATTERNS))
+        self._context = _pattern_group(tuple(self.CONTEXT_MANIPULATION_PATTERNS))
+        self._encoding = _pattern_group(tuple(self.ENCODING_PATTERNS))
+
+    @property
+    def strict_mode(self) -> bool:
+        """Whether encoding/evasion patterns are also checked."""
+        return self._strict_mode
+
+    @strict_mode.setter
+    def strict_mode(self, strict_mode: bool):
+        # Bind the categories and analysis path for this mode once, so
+        # analyze() itself does not branch on it.
+        self._strict_mode = strict_mode
+        if strict_mode:
+            self._categories = (self._instruction, self._context, self._encoding)
+            self._analyze_uncached = self._analyze_strict
+        else:
+            self._categories = (self._instruction, self._context)
+            self._analyze_uncached = self._analyze_lenient
+        self._scan = _anchor_scan(self._categories)
+        # Cached results were computed for the previous mode.
+        self._analysis_cache.clear()
     
     def analyze(self, text: str) -> SecurityResult:
         """
@@ -134,35 +703,135 @@ class PromptInjectionDetector:
         Returns:
             SecurityResult with analysis findings
         """
-        cached = self._analysis_cache.get(text)
+        key, cached = self._cached(text)
         if cached is not None:
-            self._analysis_cache.move_to_end(text)
-            is_safe, threats_tuple, confidence = cached
-            return SecurityResult(
-                is_safe=is_safe,
-                threats=list(threats_tuple),
-                confidence=confidence,
+            return cached
+
+        return self._analyze_uncached(key, text)
+
+    def _analyze_lenient(self, key, text: str) -> SecurityResult:
+        """Analyze uncached text for the instruction and context categories."""
+        lowered = _lowered(text)
+        if lowered is None:
+            return self._result(
+                key,
+                self._instruction.search(text, None),
+                self._context.search(text, None),
             )
 
-        threats = []
+        # ASCII text: find every category's anchors in one pass, then only
+        # run the patterns whose anchors occur.
+        found = self._scan(lowered)
+        return self._result(
+            key,
+            self._instruction.search_found(text, lowered, found),
+            self._context.search_found(text, lowered, found),
+        )
 
-        # Single-search checks avoid repeated pattern iteration per request.
-        if self._instruction_any_pattern.search(text):
-            threats.append("Instruction override pattern detected")
+    def _analyze_strict(self, key, text: str) -> SecurityResult:
+        """Like _analyze_lenient(), also checking encoding/evasion."""
+        lowered = _lowered(text)
+        if lowered is None:
+            return self._result(
+                key,
+                self._instruction.search(text, None),
+                self._context.search(text, None),
+                self._encoding.search(text, None),
+            )
 
-        if self._context_any_pattern.search(text):
-            threats.append("Context manipulation pattern detected")
+        found = self._scan(lowered)
+        return self._result(
+            key,
+            self._instruction.search_found(text, lowered, found),
+            self._context.search_found(text, lowered, found),
+            self._encoding.search_found(text, lowered, found),
+        )
+
+    def analyze_many(self, texts: List[str]) -> List[SecurityResult]:
+        """
+        Analyze several texts, scanning them as one batch.
 
-        if self.strict_mode and self._encoding_any_pattern.search(text):
+        Uncached short ASCII texts are joined into a single buffer so each
+        anchor literal is located with one scan of the batch instead of one
+        lookup per text; each text is then checked as in analyze(). Longer
+        texts gain nothing from joining and are analyzed one by one.
+        
+        Args:
+            texts: The texts to analyze
+            
+        Returns:
+            SecurityResult for each text, in order
+        """
+        results = []
+        batch = []
+        for text in texts:
+            key, cached = self._cached(text)
+            if cached is None and (len(text) >= _BATCH_TEXT_CHARS
+                                   or not text.isascii()):
+                cached = self._analyze_uncached(key, text)
+            results.append(cached)
+            if cached is None:
+                batch.append((len(results) - 1, key, text))
+        if not batch:
+            return results
+
+        lowered = [text.lower() for _, _, text in batch]
+        starts = []
+        offset = 0
+        for text in lowered:
+            starts.append(offset)
+            offset += len(text) + len(_BATCH_SEPARATOR)
+        buffer = _BATCH_SEPARATOR.join(lowered)
+
+        scans = self._scan.scan_many(buffer, starts, lowered)
+        for n, (index, key, text) in enumerate(batch):
+            results[index] = self._result(key, *[
+                group.search_found(text, lowered[n], scans[n])
+                for group in self._categories
+            ])
+        return results
+
+    def _cached(self, text: str):
+        """Return (cache key, cached SecurityResult or None) for text."""
+        # Nothing to scan (or to cache) in empty input.
+        if not text:
+            return None, SecurityResult(is_safe=True, threats=[], confidence=0.95)
+        # Very long inputs rarely recur; don't spend cache space on them.
+        if len(text) > _CACHE_MAX_TEXT_CHARS:
+            return None, None
+        key = _cache_key(text)
+        cached = self._analysis_cache.get(key)
+        if cached is None:
+            return key, None
+        is_safe, threats_tuple, confidence = cached
+        return key, SecurityResult(
+            is_safe=is_safe,
+            threats=list(threats_tuple),
+            confidence=confidence,
+        )
+
+    def _result(self, key, instruction: bool, context: bool,
+                encoding: bool = False) -> SecurityResult:
+        """Build (and cache) the result for one text's category matches."""
+        threats = []
+        if instruction:
+            threats.append("Instruction override pattern detected")
+        if context:
+            threats.append("Context manipulation pattern detected")
+        if encoding:
             threats.append("Potential encoding/evasion detected")
         
         is_safe = len(threats) == 0
         confidence = 0.95 if is_safe else 0.85
 
-        self._analysis_cache[text] = (is_safe, tuple(threats), confidence)
-        self._analysis_cache.move_to_end(text)
-        if len(self._analysis_cache) > self._analysis_cache_size:
-            self._analysis_cache.popitem(last=False)
+        if key is not None:
+            threats_tuple = tuple(threats)
+            self._analysis_cache.put(
+                key,
+                (is_safe, threats_tuple, confidence),
+                _sizeof(key) + _sizeof(threats_tuple)
+                + _CACHE_ENTRY_OVERHEAD,
+            )
 
         return SecurityResult(
             is_safe=is_safe,
@@ -182,14 +851,19 @@ class PromptInjectionDetector:
             Sanitized text
         """
         sanitized = text
+        lowered = _lowered(text)
         
-        # Remove instruction patterns
-        for pattern in self._instruction_patterns:
-            sanitized = pattern.sub(replacement, sanitized)
+        # Remove instruction patterns. Clean text (the common case) skips
+        # the per-pattern substitution loop entirely.
+        if self._instruction.search(sanitized, lowered):
+            for pattern in self._instruction.patterns:
+                sanitized = pattern.sub(replacement, sanitized)
+            lowered = _lowered(sanitized)
         
         # Remove context manipulation
-        for pattern in self._context_patterns:
-            sanitized = pattern.sub(replacement, sanitized)
+        if self._context.search(sanitized, lowered):
+            for pattern in self._context.patterns:
+                sanitized = pattern.sub(replacement, sanitized)
         
         return sanitized
 
@@ -225,12 +899,9 @@ class OutputValidator:
         self._compile_patterns()
     
     def _compile_patterns(self):
-        self._leakage_patterns = [
-            re.compile(p, re.IGNORECASE) for p in self.PROMPT_LEAKAGE_PATTERNS
-        ]
-        self._sensitive_patterns = [
-            re.compile(p, re.IGNORECASE) for p in self.SENSITIVE_DATA_PATTERNS
-        ]
+        self._leakage = _pattern_group(tuple(self.PROMPT_LEAKAGE_PATTERNS))
+        self._sensitive = _pattern_group(tuple(self.SENSITIVE_DATA_PATTERNS))
+        self._scan = _anchor_scan((self._leakage, self._sensitive))
     
     def validate(self, output: str) -> SecurityResult:
         """
@@ -243,18 +914,22 @@ class OutputValidator:
             SecurityResult with findings
         """
         threats = []
+        lowered = _lowered(output)
+        if lowered is None:
+            leakage = self._leakage.search(output, None)
+            sensitive = self._sensitive.search(output, None)
+        else:
+            found = self._scan(lowered)
+            leakage = self._leakage.search_found(output, lowered, found)
+            sensitive = self._sensitive.search_found(output, lowered, found)
         
         # Check for prompt leakage
-        for pattern in self._leakage_patterns:
-            if pattern.search(output):
-                threats.append("Potential prompt leakage detected")
-                break
+        if leakage:
+            threats.append("Potential prompt leakage detected")
         
         # Check for sensitive data exposure.
-        for pattern in self._sensitive_patterns:
-            if pattern.search(output):
-                threats.append("Sensitive data pattern detected")
-                break
+        if sensitive:
+            threats.append("Sensitive data pattern detected")
         
         is_safe = len(threats) == 0
         
@@ -265,6 +940,19 @@ class OutputValidator:
         )
 
 
+# Shared instances for the convenience functions. Pattern groups are already
+# shared; this also shares the analysis cache across calls. They are built on
+# first use so that importing the module doesn't compile any patterns.
+@lru_cache(maxsize=None)
+def _default_detector() -> PromptInjectionDetector:
+    return PromptInjectionDetector()
+
+
+@lru_cache(maxsize=None)
+def _validator() -> OutputValidator:
+    return OutputValidator()
+
+
 # Convenience functions
 
 def sanitize(input_text: str) -> str:
@@ -280,13 +968,15 @@ def sanitize(input_text: str) -> str:
     Raises:
         SecurityError: If input contains known threats
     """
-    detector = PromptInjectionDetector()
-    result = detector.analyze(input_text)
+    result = _default_detector().analyze(input_text)
     
     if not result.is_safe:
         raise SecurityError(f"Potential threat detected: {', '.join(result.threats)}")
     
-    return detector.sanitize(input_text)
+    # analyze() checked the same instruction and context patterns that
+    # sanitize() would replace, so safe text comes back unchanged; skip
+    # lowercasing and scanning it a second time.
+    return input_text
 
 
 def validate_output(output_text: str) -> str:
@@ -302,8 +992,7 @@ def validate_output(output_text: str) -> str:
     Raises:
         SecurityError: If output contains security issues
     """
-    validator = OutputValidator()
-    result = validator.validate(output_text)
+    result = _validator().validate(output_text)
     
     if not result.is_safe:
         raise SecurityError(f"Security issue in output: {', '.join(result.threats)}")
@@ -321,8 +1010,7 @@ def detect(text: str) -> Tuple[bool, List[str]]:
     Returns:
         Tuple of (is_safe, list of threats)
     """
-    detector = PromptInjectionDetector()
-    result = detector.analyze(text)
+    result = _default_detector().analyze(text)
     return result.is_safe, result.threats
 
 
@@ -5,19 +5,24 @@ Detect Injection CLI
 Usage:
     python3 detect_injection.py "text to analyze"
     echo "text" | python3 detect_injection.py -
+    cat prompts.txt | python3 detect_injection.py --lines
 """
 
 import sys
 import json
-from lib.defense_core import detect, PromptInjectionDetector
+from lib.defense_core import PromptInjectionDetector
 
 
 def main():
     if len(sys.argv) < 2:
         print("Usage: python3 detect_injection.py <text>")
         print("   or: echo <text> | python3 detect_injection.py -")
+        print("   or: cat <file> | python3 detect_injection.py --lines")
         sys.exit(1)
     
+    if sys.argv[1] == '--lines':
+        return main_lines()
+    
     # Read input
     if sys.argv[1] == '-':
         text = sys.stdin.read().strip()
@@ -42,5 +47,32 @@ def main():
     sys.exit(0 if result.is_safe else 1)
 
 
+def main_lines():
+    """Analyze each non-empty stdin line separately, as one batch."""
+    # One bulk read; stdin is in universal-newline text mode, so this
+    # splits exactly like iterating over its lines.
+    texts = [line.strip() for line in sys.stdin.read().split("\n")]
+    texts = [text for text in texts if text]
+    
+    if not texts:
+        print("Error: No input provided")
+        sys.exit(1)
+    
+    detector = PromptInjectionDetector(strict_mode=True)
+    results = detector.analyze_many(texts)
+    
+    sys.stdout.write("".join(
+        json.dumps({
+            "text": text,
+            "is_safe": result.is_safe,
+            "threats": result.threats,
+            "confidence": result.confidence
+        }) + "\n"
+        for text, result in zip(texts, results)
+    ))
+    
+    sys.exit(0 if all(result.is_safe for result in results) else 1)
+
+
 if __name__ == "__main__":
     main()
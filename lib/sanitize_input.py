@@ -9,7 +9,7 @@ Usage:
 
 import sys
 import json
-from lib.defense_core import sanitize, detect, PromptInjectionDetector, SecurityError
+from lib.defense_core import sanitize, detect, SecurityError
 
 
 def main():
@@ -29,7 +29,6 @@ def main():
         sys.exit(1)
     
     # First analyze for threats
-    detector = PromptInjectionDetector()
     is_safe, threats = detect(text)
     
     if is_safe: